@@ -1,13 +1,24 @@
 from fastmcp import FastMCP
-import requests
-import urllib3
-import json
+import httpx
+import orjson
+import ijson
 import os
+import random
+import re
+import ssl
+import sys
 from dotenv import load_dotenv
 import asyncio # Added asyncio
-from typing import Optional, List, Dict, Any
+import functools
+import importlib.util
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Dict, Any, AsyncIterator, Awaitable, Callable
 from pydantic import Json # Added Json for type hinting
 from datetime import datetime, timedelta, timezone # Added for time conversion tool
+from urllib.parse import urlparse
 
 # Determine the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,27 +37,200 @@ else:
     # if no path is specified and file doesn't exist.
     load_dotenv() 
 
-# Disable SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# uvloop (winloop on Windows) is a faster libuv-based drop-in for the default asyncio event loop.
+# Its policy is set at import time so it also applies under `fastmcp run`, which imports this file
+# and starts the loop itself. It's optional: without it the server runs on the standard asyncio loop.
+try:
+    if sys.platform == "win32":
+        import winloop as libuv_loop
+    else:
+        import uvloop as libuv_loop
+    asyncio.set_event_loop_policy(libuv_loop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # Global token storage and lock
-_current_token = None
+# The token is cached as (token, expiry) where expiry is a time.monotonic() timestamp.
+# Catalyst Center tokens are valid for ~1 hour; treat them as valid for 55 minutes and
+# refresh a little early so requests don't race the expiry and hit a 401.
+_TOKEN_TTL_SECONDS = 3300
+_TOKEN_REFRESH_MARGIN_SECONDS = 60
+# Within this many seconds of expiry a refresh starts in the background while callers keep
+# using the still-valid token, so steady traffic never waits on an auth round trip.
+_TOKEN_PROACTIVE_REFRESH_SECONDS = 300
+_token_cache: Optional[tuple[str, float]] = None
+# Only guards starting a refresh. Reading or clearing _token_cache involves no await,
+# so it can't interleave with other coroutines and needs no lock.
 _token_lock = asyncio.Lock()
+# Authentication currently in flight, shared by every caller waiting for a new token
+_refresh_task: Optional[asyncio.Task[str]] = None
+
+# Headers sent with every request, set once on the shared client so tools only add X-Auth-Token.
+# Accept-Encoding is left to httpx: it advertises gzip/deflate (and br, via the brotli extra)
+# and decompresses transparently, so only encodings it can actually decode are requested.
+_BASE_HEADERS = {"Accept": "application/json"}
+
+# Per-route timeouts. Every call fails fast on connect. Authentication returns a tiny body and
+# gets 10s, while large inventory/client list responses get up to 30s, so a hung CCC socket
+# can't pin a tool call indefinitely.
+_HTTP_TIMEOUTS = {
+    "default": httpx.Timeout(30.0, connect=5.0),
+    "auth": httpx.Timeout(10.0, connect=5.0),
+}
+
+logger = logging.getLogger("catalyst_center_mcp")
+# Logs go to stderr, which stdio MCP clients keep separate from the protocol on stdout. Set up at
+# import time because `fastmcp run` imports this file rather than running it as __main__.
+# CCC_LOG_LEVEL=DEBUG adds tool, request, token refresh and JSON timings ("ccc.tool", "ccc.http",
+# "ccc.auth", "ccc.json"). Only this server's logger is configured: the root logger stays at
+# WARNING, because httpx/httpcore/hpack debug logs include header values such as X-Auth-Token
+# and the Basic credentials of the token request.
+if not logger.handlers:
+    _log_handler = logging.StreamHandler(sys.stderr)
+    _log_handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+    logger.addHandler(_log_handler)
+logger.setLevel(os.getenv("CCC_LOG_LEVEL", "WARNING").upper())
+logger.propagate = False
+# Name of the tool being run, attached to the timing logs of the requests it makes
+_current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+def _instrumented(tool: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Wraps a tool so its duration is logged and its requests' logs carry its name."""
+    @functools.wraps(tool)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        # All of this is for debug logs; skip it entirely at the default level
+        if not logger.isEnabledFor(logging.DEBUG):
+            return await tool(*args, **kwargs)
+        context_token = _current_tool.set(tool.__name__)
+        started = time.perf_counter()
+        try:
+            result = await tool(*args, **kwargs)
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.debug("ccc.tool %s failed in %.1f ms: %s", tool.__name__, elapsed_ms, e,
+                         extra={"tool": tool.__name__, "ms": elapsed_ms, "error": str(e)})
+            raise
+        finally:
+            _current_tool.reset(context_token)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.debug("ccc.tool %s took %.1f ms (%d chars)", tool.__name__, elapsed_ms, len(result),
+                     extra={"tool": tool.__name__, "ms": elapsed_ms, "chars": len(result)})
+        return result
+    return wrapper
+
+# HTTP/2 lets concurrent tool calls share one connection. httpx needs the optional h2 package
+# for it (installed by the httpx[http2] requirement); without it, fall back to HTTP/1.1.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Shared async HTTP client, created lazily on first use so it binds to the running event loop
+_client: Optional[httpx.AsyncClient] = None
+
+def _build_ssl_context() -> ssl.SSLContext:
+    """Builds the TLS context for the shared client.
+
+    If CCC_CA_BUNDLE is set, Catalyst Center's certificate is verified against that CA bundle.
+    Otherwise verification is disabled, as Catalyst Center commonly uses a self-signed certificate.
+    """
+    if CCC_CA_BUNDLE:
+        return ssl.create_default_context(cafile=CCC_CA_BUNDLE)
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Returns the shared async HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=CCC_HOST or "",
+            headers=_BASE_HEADERS,
+            verify=_build_ssl_context(),
+            http2=_HTTP2_AVAILABLE,
+            timeout=_HTTP_TIMEOUTS["default"],
+            # Keep idle connections for a minute (httpx defaults to 5s) so the TLS session survives
+            # the gaps between an LLM's tool calls
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+        )
+    return _client
+
+async def _close_http_client() -> None:
+    """Closes the shared async HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _prewarm_dns() -> None:
+    """Resolves CCC_HOST ahead of the first request so the initial auth call skips the lookup."""
+    parsed = urlparse(CCC_HOST or "")
+    if not parsed.hostname:
+        return
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        # loop.getaddrinfo runs in the default executor, so this doesn't block the event loop
+        await asyncio.get_running_loop().getaddrinfo(parsed.hostname, port)
+    except OSError:
+        pass # Resolution failures surface on the first real request instead
+
+async def _prefetch_token() -> None:
+    """Authenticates ahead of the first tool call so it doesn't pay for the auth round trip."""
+    try:
+        await get_or_refresh_token()
+    except Exception:
+        pass # Failures surface on the first tool call, which authenticates again
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Warms up DNS and the auth token at startup and releases pooled connections at shutdown."""
+    warmup_tasks = [asyncio.create_task(_prewarm_dns()), asyncio.create_task(_prefetch_token())]
+    try:
+        yield
+    finally:
+        for task in warmup_tasks:
+            task.cancel()
+        await _close_http_client()
 
 # Create an MCP server
 # This MCP server provides tools to interact with Cisco Catalyst Center:
 # - fetch_devices: Fetches a list of devices.
 # - fetch_sites: Fetches a list of sites.
 # - fetch_interfaces: Fetches interface information for a specific device.
+# - fetch_all_interfaces: Fetches interface information for several devices concurrently.
+# - fetch_devices_with_interfaces: Fetches devices together with their interfaces.
 # - get_clients_list: Retrieves the list of clients with filtering and sorting.
 # - get_client_details_by_mac: Retrieves specific client information by MAC address.
 # - get_clients_count: Retrieves the total count of clients with filtering.
-mcp: FastMCP = FastMCP("Catalyst Center MCP")
+mcp: FastMCP = FastMCP("Catalyst Center MCP", lifespan=_lifespan)
+
+# Largest accepted CCC_TOKEN_TTL_JITTER; more would re-authenticate far more often than needed
+_TOKEN_TTL_JITTER_MAX = 0.5
+
+def _parse_token_ttl_jitter(raw: str) -> float:
+    """Parses CCC_TOKEN_TTL_JITTER, raising a clear error unless it is a number from 0 to 0.5."""
+    try:
+        jitter = float(raw)
+    except ValueError:
+        jitter = float("nan")
+    if not 0 <= jitter <= _TOKEN_TTL_JITTER_MAX: # Also rejects NaN
+        raise ValueError(f"CCC_TOKEN_TTL_JITTER must be a number between 0 and {_TOKEN_TTL_JITTER_MAX}, got {raw!r}.")
+    return jitter
 
 # Configuration from environment variables
 CCC_HOST = os.getenv('CCC_HOST')
 CCC_USER = os.getenv('CCC_USER')
 CCC_PWD = os.getenv('CCC_PWD')
+CCC_CA_BUNDLE = os.getenv('CCC_CA_BUNDLE') # Optional path to a PEM CA bundle for verifying CCC's certificate
+CCC_TOKEN_TTL_JITTER = _parse_token_ttl_jitter(os.getenv('CCC_TOKEN_TTL_JITTER', '0.1')) # Fraction of the token lifetime randomly shaved off each cached expiry
+
+# Catalyst Center API paths, relative to CCC_HOST (the shared client's base_url)
+_AUTH_PATH = "/dna/system/api/v1/auth/token"
+_DEVICES_PATH = "/dna/intent/api/v1/network-device"
+_SITES_PATH = "/dna/intent/api/v1/site"
+_INTERFACES_PATH = "/dna/intent/api/v1/interface/network-device/{device_id}"
+_CLIENTS_PATH = "/dna/data/api/v1/clients"
+_CLIENTS_COUNT_PATH = "/dna/data/api/v1/clients/count"
+_CLIENT_DETAILS_PATH = "/dna/data/api/v1/clients/{client_mac_address}"
 
 # Internal function to perform authentication
 async def _perform_authentication() -> str:
@@ -70,17 +254,24 @@ async def _perform_authentication() -> str:
     # At this point, Mypy should infer host, user, and pwd as str
     # because the check above would have raised ValueError if they were None or empty.
     
-    url = f"{host}/dna/system/api/v1/auth/token"
-    
     # Explicitly create the auth tuple with types Mypy can verify
     auth_credentials: tuple[str, str] = (user, pwd)
     
-    # In a real async environment, consider using an async HTTP client like httpx
-    # For simplicity with 'requests', this will run synchronously within the async def.
-    # FastMCP typically runs tools in a thread pool, mitigating some blocking.
-    response = requests.post(url, auth=auth_credentials, verify=False)
+    # Authentication counts towards the circuit breaker too, so a down CCC fails fast even with no token
+    _circuit_breaker.check()
+    try:
+        response = await _get_http_client().post(_AUTH_PATH, auth=auth_credentials, timeout=_HTTP_TIMEOUTS["auth"])
+    except httpx.TransportError:
+        _circuit_breaker.record_failure()
+        raise
+    if response.status_code >= 500:
+        _circuit_breaker.record_failure()
+    else:
+        _circuit_breaker.record_success()
     if response.status_code == 200:
-        token_data = response.json() # Store intermediate json
+        # Whether CCC actually negotiated HTTP/2 (via ALPN) or fell back to HTTP/1.1
+        logger.info("Authenticated with Cisco Catalyst Center over %s", response.http_version)
+        token_data = orjson.loads(response.content) # Store intermediate json
         token_val = token_data.get("Token") # Use a different variable name
         if not token_val:
             raise Exception("Authentication successful, but no token found in response.")
@@ -91,23 +282,433 @@ async def _perform_authentication() -> str:
     else:
         raise Exception(f"Failed to authenticate with Cisco Catalyst Center. Status: {response.status_code}, Body: {response.text}")
 
+# Returns the cached token if it is still fresh, otherwise None
+def _cached_token() -> Optional[str]:
+    """Returns the cached token unless it is missing or about to expire."""
+    if _token_cache is not None and time.monotonic() < _token_cache[1] - _TOKEN_REFRESH_MARGIN_SECONDS:
+        return _token_cache[0]
+    return None
+
+# Internal function that performs one authentication and stores the result
+async def _refresh_token() -> str:
+    """Authenticates with Cisco Catalyst Center and caches the new token."""
+    global _token_cache, _refresh_task
+    try:
+        timed = logger.isEnabledFor(logging.DEBUG)
+        started = time.perf_counter() if timed else 0.0
+        token = await _perform_authentication()
+        if timed:
+            logger.debug("ccc.auth token refresh took %.1f ms", (time.perf_counter() - started) * 1000)
+        # Jitter the lifetime so tokens minted in the same burst (or by several replicas) don't
+        # all come up for refresh at the same moment.
+        ttl = _TOKEN_TTL_SECONDS - random.uniform(0, _TOKEN_TTL_SECONDS * CCC_TOKEN_TTL_JITTER)
+        _token_cache = (token, time.monotonic() + ttl)
+        # print(f"DEBUG: New token obtained: {token[:10]}...") # Optional for debugging
+        return token
+    finally:
+        _refresh_task = None
+
+# Done callback for refreshes started ahead of expiry, which may never be awaited
+def _log_background_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background token refresh failed: %s", task.exception())
+
 # Helper function to get or refresh the token
 async def get_or_refresh_token() -> str:
-    """Gets the current token or refreshes it if necessary."""
-    global _current_token
+    """Gets the current token or refreshes it if necessary.
+
+    A fresh token is returned without taking the lock; once it is near expiry a refresh is
+    started in the background and the cached token is still returned. When a refresh is needed,
+    concurrent callers all await the same in-flight authentication task, so N
+    coroutines hitting an expired token trigger one auth request, not N.
+    """
+    global _refresh_task
+    cache = _token_cache
+    token = _cached_token()
+    if token is not None and cache is not None:
+        if _refresh_task is None and time.monotonic() > cache[1] - _TOKEN_PROACTIVE_REFRESH_SECONDS:
+            # Nothing awaits this task until the token actually expires, so log a failure here;
+            # the next caller past the margin will simply try again.
+            _refresh_task = asyncio.create_task(_refresh_token())
+            _refresh_task.add_done_callback(_log_background_refresh_failure)
+        return token
     async with _token_lock:
-        if _current_token is None:
-            # print("DEBUG: Token is None or invalid, performing new authentication.") # Optional for debugging
-            _current_token = await _perform_authentication()
-            # print(f"DEBUG: New token obtained: {_current_token[:10]}...") # Optional for debugging
-        return _current_token
+        token = _cached_token()
+        if token is not None:
+            return token
+        if _refresh_task is None:
+            # print("DEBUG: Token is None or about to expire, performing new authentication.") # Optional for debugging
+            _refresh_task = asyncio.create_task(_refresh_token())
+        refresh_task = _refresh_task
+    # Shield the shared task: if this caller's tool call is cancelled, the refresh must keep
+    # running for the other coroutines awaiting it rather than failing them all.
+    return await asyncio.shield(refresh_task)
+
+# Helper used on a 401: drop the rejected token and authenticate again
+async def _invalidate_and_refresh_token(stale_token: str) -> str:
+    """Discards stale_token and returns a freshly authenticated one.
+
+    If another caller has already replaced stale_token (several requests sent with the same
+    expired token all get a 401), its replacement is returned instead of authenticating again.
+    """
+    global _token_cache
+    if _token_cache is not None and _token_cache[0] == stale_token:
+        _token_cache = None
+    return await get_or_refresh_token()
+
+# ---- Circuit Breaker ----
+class _CircuitBreaker:
+    """Fails fast while Catalyst Center is down instead of letting every tool call wait on it.
+
+    After `failure_threshold` consecutive failures (transport errors or 5xx responses, including
+    from authentication) the breaker opens and requests are rejected for `reset_timeout` seconds.
+    After that a single probe request is let through while the rest are still rejected; its
+    success closes the breaker and its failure reopens it. A probe that never reports back is
+    replaced by another one `reset_timeout` seconds later.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+
+    def check(self) -> None:
+        """Raises if the breaker is open; once the open period has passed, lets one probe through."""
+        if self._failures < self.failure_threshold:
+            return
+        now = time.monotonic()
+        remaining = self._open_until - now
+        if remaining <= 0:
+            # Half-open: this caller is the probe; everyone else is rejected until it reports back
+            self._open_until = now + self.reset_timeout
+            return
+        raise Exception(
+            f"Catalyst Center appears unavailable after {self._failures} consecutive failures; "
+            f"not sending requests for another {remaining:.0f}s."
+        )
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            self._open_until = time.monotonic() + self.reset_timeout
+
+_circuit_breaker = _CircuitBreaker(failure_threshold=5, reset_timeout=30)
+
+# Identical GETs currently in flight, keyed by method, path, params and headers. Overlapping
+# callers (common when an LLM fires the same tool several times) share one upstream request.
+_inflight_requests: Dict[str, asyncio.Task[httpx.Response]] = {}
+
+# Internal helper for authenticated requests
+async def _authed_request(
+    method: str,
+    path: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    max_retries: int = 1,
+    stream: bool = False,
+) -> httpx.Response:
+    """Sends an authenticated request to Catalyst Center and returns the response.
+
+    On a 401 the cached token is invalidated and the request is retried with a new token,
+    up to `max_retries` times. Any other status is returned to the caller to interpret.
+    With `stream=True` the body is not read; the caller must close the response.
+    Non-streaming GETs identical to one already in flight await that request's response
+    instead of sending their own.
+    """
+    if method != "GET" or stream:
+        return await _send_authed_request(method, path, params=params, extra_headers=extra_headers, max_retries=max_retries, stream=stream)
+
+    key = f"{method} {_response_cache_key(path, params)} {orjson.dumps(extra_headers or {}, option=orjson.OPT_SORT_KEYS).decode()}"
+    task = _inflight_requests.get(key)
+    if task is None:
+        task = asyncio.create_task(_send_authed_request(method, path, params=params, extra_headers=extra_headers, max_retries=max_retries))
+        _inflight_requests[key] = task
+        task.add_done_callback(lambda _: _inflight_requests.pop(key, None))
+    # Shielded so one cancelled caller doesn't cancel the request for everyone sharing it
+    return await asyncio.shield(task)
+
+async def _send_authed_request(
+    method: str,
+    path: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    max_retries: int = 1,
+    stream: bool = False,
+) -> httpx.Response:
+    """Sends one authenticated request, refreshing the token and retrying on a 401."""
+    client = _get_http_client()
+    token = await get_or_refresh_token()
+    # Checked after the token so that, when half-open, an authentication can be the probe
+    _circuit_breaker.check()
+    attempt = 0
+    while True:
+        request = client.build_request(method, path, headers={"X-Auth-Token": token, **(extra_headers or {})}, params=params)
+        # Request timings are only measured when they will be logged
+        timed = logger.isEnabledFor(logging.DEBUG)
+        started = time.perf_counter() if timed else 0.0
+        try:
+            response = await client.send(request, stream=stream)
+        except httpx.TransportError as e:
+            _circuit_breaker.record_failure()
+            elapsed = f" after {(time.perf_counter() - started) * 1000:.1f} ms" if timed else ""
+            logger.warning("ccc.http [%s] %s %s failed%s: %r", _current_tool.get(), method, path, elapsed, e)
+            raise
+        if timed:
+            # Time to the full body, or to the headers for a streamed response whose body isn't read yet
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            size = None if stream else len(response.content)
+            tool_name = _current_tool.get()
+            logger.debug(
+                "ccc.http [%s] %s %s -> %d in %.1f ms (%s)", tool_name, method, path, response.status_code, elapsed_ms,
+                "streamed" if size is None else f"{size} bytes",
+                extra={"tool": tool_name, "method": method, "path": path, "status": response.status_code, "ms": elapsed_ms, "bytes": size},
+            )
+        if response.status_code >= 500:
+            _circuit_breaker.record_failure()
+        else:
+            _circuit_breaker.record_success()
+
+        if response.status_code != 401 or attempt >= max_retries:
+            return response
+        # print(f"DEBUG: Token expired for {method} {path}. Refreshing.") # Optional
+        if stream:
+            await response.aclose()
+        attempt += 1
+        token = await _invalidate_and_refresh_token(token)
+
+class _NotModified(Exception):
+    """Raised when a conditional GET is answered with 304 Not Modified."""
+
+def _conditional_headers(etag: Optional[str]) -> Optional[Dict[str, str]]:
+    """Returns the If-None-Match header for etag, or None for an unconditional request."""
+    return {"If-None-Match": etag} if etag else None
+
+# Internal helper for authenticated GET requests that expect a JSON body
+async def _authed_get_response(path: str, params: Optional[Dict[str, Any]] = None, etag: Optional[str] = None) -> httpx.Response:
+    """Performs an authenticated GET against Catalyst Center and returns the successful response.
+    With `etag` the request is conditional and _NotModified is raised if the server replies 304."""
+    response = await _authed_request("GET", path, params=params, extra_headers=_conditional_headers(etag))
+    if response.status_code == 304:
+        raise _NotModified()
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        raise Exception(f"Request to {path} failed. Status: {response.status_code}, Body: {response.text}")
+    return response
+
+# Internal helper for streaming an authenticated GET
+@asynccontextmanager
+async def _authed_stream(path: str, params: Optional[Dict[str, Any]] = None, etag: Optional[str] = None) -> AsyncIterator[httpx.Response]:
+    """Performs an authenticated GET and yields the successful response with its body unread.
+    With `etag` the request is conditional and _NotModified is raised if the server replies 304."""
+    response = await _authed_request("GET", path, params=params, extra_headers=_conditional_headers(etag), stream=True)
+    try:
+        if response.status_code == 304:
+            raise _NotModified()
+        if not response.is_success:
+            await response.aread()
+            raise Exception(f"Request to {path} failed. Status: {response.status_code}, Body: {response.text}")
+        yield response
+    finally:
+        await response.aclose()
+
+async def _iter_json_items(response: httpx.Response, prefix: str = "response.item") -> AsyncIterator[Any]:
+    """Yields each element of the array at `prefix` in a streamed response body as it is parsed.
+
+    The body is parsed incrementally with ijson, so neither the raw payload nor the full
+    response envelope is held in memory at once.
+    """
+    items = ijson.sendable_list()
+    # use_float keeps numbers as float rather than Decimal, which orjson can't serialize
+    parser = ijson.items_coro(items, prefix, use_float=True)
+    async for chunk in response.aiter_bytes():
+        parser.send(chunk)
+        for item in items:
+            yield item
+        del items[:]
+    parser.close()
+    for item in items:
+        yield item
+
+async def _serialize_items(items: AsyncIterator[Any]) -> str:
+    """Serializes items into a JSON array string as they arrive, without collecting them in a list first."""
+    buf = bytearray(b"[")
+    async for item in items:
+        if len(buf) > 1:
+            buf += b","
+        buf += orjson.dumps(item)
+    buf += b"]"
+    return buf.decode()
+
+# ---- Response Cache ----
+# Sites, the device inventory, interfaces and client counts change on the order of minutes,
+# so their serialized responses are cached per URL + query parameters for a short TTL.
+_SITES_CACHE_TTL_SECONDS = 300
+_DEVICES_CACHE_TTL_SECONDS = 60
+_INTERFACES_CACHE_TTL_SECONDS = 30
+_COUNTS_CACHE_TTL_SECONDS = 30
+# How long past its TTL an entry may still be served if Catalyst Center is failing
+_RESPONSE_CACHE_GRACE_SECONDS = 300
+_RESPONSE_CACHE_MAX_ENTRIES = 256
+# Maps cache key -> (expiry as a time.monotonic() timestamp, serialized JSON response, ETag).
+# Once an entry expires, its ETag lets the next fetch be a conditional GET, so an unchanged
+# list costs a 304 instead of a full download and re-serialization.
+_response_cache: Dict[str, tuple[float, str, Optional[str]]] = {}
+
+def _response_cache_key(path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Builds a stable cache key from a request path and its query parameters."""
+    if not params:
+        return path
+    return f"{path}?{orjson.dumps(params, option=orjson.OPT_SORT_KEYS).decode()}"
+
+def _get_cached_response(key: str, grace: float = 0.0) -> Optional[str]:
+    """Returns the cached response for key, or None if it is missing or expired.
+    An expired entry is still returned if it expired less than `grace` seconds ago."""
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    now = time.monotonic()
+    if now >= entry[0] + grace:
+        if now >= entry[0] + _RESPONSE_CACHE_GRACE_SECONDS:
+            _response_cache.pop(key, None)
+        return None
+    return entry[1]
+
+def _cache_response(key: str, value: str, ttl: float, etag: Optional[str] = None) -> str:
+    """Stores value (and the ETag it was served with) in the response cache for ttl seconds and returns it."""
+    # Re-inserting moves the key to the end, so the first key is always the least recently stored,
+    # and replacing an existing entry never evicts another one
+    _response_cache.pop(key, None)
+    if len(_response_cache) >= _RESPONSE_CACHE_MAX_ENTRIES:
+        now = time.monotonic()
+        for stale_key in [k for k, (expiry, *_) in _response_cache.items() if expiry + _RESPONSE_CACHE_GRACE_SECONDS <= now]:
+            del _response_cache[stale_key]
+        if len(_response_cache) >= _RESPONSE_CACHE_MAX_ENTRIES:
+            # Still full: evict the least recently stored entry (dicts preserve insertion order)
+            del _response_cache[next(iter(_response_cache))]
+    _response_cache[key] = (time.monotonic() + ttl, value, etag)
+    return value
+
+# Cache misses currently being fetched, keyed by cache key
+_inflight_fetches: Dict[str, asyncio.Task[str]] = {}
+
+async def _cached_conditional_response(
+    key: str,
+    ttl: float,
+    fetch: Callable[[Optional[str]], Awaitable[tuple[str, Optional[str]]]],
+) -> str:
+    """Returns the cached response for key, or awaits fetch() and caches its result for ttl seconds.
+
+    fetch() is passed the ETag of the expired entry, if any, and returns the new value with its
+    ETag; it raises _NotModified on a 304, in which case the expired value is kept for another ttl.
+    If fetch() fails with anything other than a ValueError (bad input), a stale entry still
+    within the grace window is returned instead of the error.
+    """
+    cached = _get_cached_response(key)
+    if cached is not None:
+        return cached
+    # Concurrent misses for the same key share one fetch. This also covers streamed fetches,
+    # which the GET dedup in _authed_request can't merge because each caller reads its own body.
+    task = _inflight_fetches.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache_response(key, ttl, fetch))
+        _inflight_fetches[key] = task
+        task.add_done_callback(lambda _: _inflight_fetches.pop(key, None))
+    # Shielded so one cancelled caller doesn't cancel the fetch for everyone sharing it
+    return await asyncio.shield(task)
+
+async def _fetch_and_cache_response(
+    key: str,
+    ttl: float,
+    fetch: Callable[[Optional[str]], Awaitable[tuple[str, Optional[str]]]],
+) -> str:
+    """Runs one fetch for _cached_conditional_response and caches the result."""
+    entry = _response_cache.get(key)
+    sent_etag = entry[2] if entry is not None else None
+    try:
+        value, etag = await fetch(sent_etag)
+    except _NotModified:
+        # Only a conditional request can be answered with 304; there is nothing to renew otherwise
+        if entry is None or sent_etag is None:
+            raise Exception("Catalyst Center answered an unconditional request with 304 Not Modified.")
+        return _cache_response(key, entry[1], ttl, sent_etag)
+    except ValueError:
+        raise
+    except Exception:
+        stale = _get_cached_response(key, grace=_RESPONSE_CACHE_GRACE_SECONDS)
+        if stale is not None:
+            return stale
+        raise
+    return _cache_response(key, value, ttl, etag)
+
+async def _cached_response(key: str, ttl: float, fetch: Callable[[], Awaitable[str]]) -> str:
+    """Like _cached_conditional_response, for endpoints fetched without revalidation."""
+    async def fetch_unconditional(_etag: Optional[str]) -> tuple[str, Optional[str]]:
+        return await fetch(), None
+
+    return await _cached_conditional_response(key, ttl, fetch_unconditional)
+
+# ---- Output Formatting ----
+# Tools return compact JSON unless the caller asks for `pretty` output; indentation roughly
+# doubles the payload and LLM clients don't need it to parse the result.
+def _dumps(data: Any, pretty: bool = False) -> str:
+    """Serializes data to a JSON string, indented by two spaces if pretty."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    started = time.perf_counter()
+    serialized = orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+    logger.debug("ccc.json [%s] encode took %.2f ms (%d chars)", _current_tool.get(), (time.perf_counter() - started) * 1000, len(serialized))
+    return serialized
+
+def _reformat(serialized: str, pretty: bool) -> str:
+    """Returns already serialized JSON as is, or re-indented if pretty."""
+    if not pretty:
+        return serialized
+    if not logger.isEnabledFor(logging.DEBUG):
+        return _dumps(orjson.loads(serialized), pretty=True)
+    started = time.perf_counter()
+    data = orjson.loads(serialized)
+    logger.debug("ccc.json [%s] decode took %.2f ms (%d chars)", _current_tool.get(), (time.perf_counter() - started) * 1000, len(serialized))
+    return _dumps(data, pretty=True)
+
+# Internal helper to turn a tool's device filters into network-device query parameters
+def _device_query_params(filters: Optional[Dict[str, Any]], required_fields: tuple[str, ...] = ()) -> Dict[str, Any]:
+    """Builds the network-device query parameters from a tool's filters.
+    An `attributes` list becomes the API's comma-separated `fields` projection, always
+    including any required_fields the caller needs from each device."""
+    params = dict(filters) if filters else {}
+    attributes = params.pop("attributes", None)
+    if attributes:
+        if isinstance(attributes, str):
+            attributes = [attributes]
+        params["fields"] = ",".join(dict.fromkeys([*required_fields, *attributes]))
+    return params
+
+# Internal helper to fetch the serialized device list for a set of filters
+async def _fetch_devices(params: Dict[str, Any]) -> str:
+    """Fetches the devices matching params as a JSON array string, cached for 60 seconds."""
+    async def fetch(etag: Optional[str]) -> tuple[str, Optional[str]]:
+        async with _authed_stream(_DEVICES_PATH, params=params, etag=etag) as response:
+            # Serialize each device as it streams in rather than building the whole list first
+            return await _serialize_items(_iter_json_items(response)), response.headers.get("ETag")
+
+    return await _cached_conditional_response(_response_cache_key(_DEVICES_PATH, params), _DEVICES_CACHE_TTL_SECONDS, fetch)
 
 # Fetch devices from CCC
 @mcp.tool()
-async def fetch_devices(filters: Optional[Json[Dict[str, Any]]] = None) -> str:
+@_instrumented
+async def fetch_devices(filters: Optional[Json[Dict[str, Any]]] = None, pretty: bool = False, raw: bool = False) -> str:
     """
     Fetches a list of devices from Cisco Catalyst Center using the `/dna/intent/api/v1/network-device` endpoint.
     Supports extensive filtering capabilities.  Never use this tool without a filter.
+    Results are cached for 60 seconds per distinct set of filters.
 
     Args:
         filters (Optional[Json[Dict[str, Any]]]): A JSON string or dictionary of filter parameters to apply. 
@@ -140,168 +741,198 @@ async def fetch_devices(filters: Optional[Json[Dict[str, Any]]] = None) -> str:
             - sortBy (str): Attribute to sort by (e.g., "hostname").
             - sortOrder (str): "asc" or "desc".
 
+            Projection:
+            - attributes (List[str]): Return only these fields of each device, e.g.,
+              `["id", "hostname", "managementIpAddress", "role"]`. Sent to the API as `fields`,
+              so unrequested fields are never transferred. Strongly recommended for large inventories.
+
             Example: 
-            `{"role": ["ACCESS"], "softwareVersion": ["17.03.04a"], "limit": "50"}`
+            `{"role": ["ACCESS"], "softwareVersion": ["17.03.04a"], "limit": "50", "attributes": ["id", "hostname"]}`
+        pretty (bool): Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
+        raw (bool): Return Catalyst Center's response body unmodified, including its `response`
+            envelope, instead of the bare device list. Skips parsing entirely. Defaults to False.
     """
     try:
-        token = await get_or_refresh_token()
-        url = f"{CCC_HOST}/dna/intent/api/v1/network-device"
-        headers = {"X-Auth-Token": token, "Accept": "application/json"}
-        
         # With Json[Dict[str, Any]], 'filters' will be a dict if provided, or None.
         # Pydantic handles the parsing of the JSON string.
-        params: Dict[str, Any] = filters if filters is not None else {}
+        params = _device_query_params(filters)
 
-        response = requests.get(url, headers=headers, params=params, verify=False)
+        if raw:
+            async def fetch_raw(etag: Optional[str]) -> tuple[str, Optional[str]]:
+                response = await _authed_get_response(_DEVICES_PATH, params=params, etag=etag)
+                return response.text, response.headers.get("ETag")
 
-        if response.status_code == 200:
-            devices = response.json().get("response", [])
-            return json.dumps(devices, indent=2)
-        elif response.status_code == 401: # Token expired or invalid
-            # print("DEBUG: Token expired for fetch_devices. Refreshing.") # Optional
-            global _current_token
-            async with _token_lock: # Ensure safe modification if multiple coroutines hit this
-                _current_token = None # Invalidate token
-            
-            token = await get_or_refresh_token() # Get new token
-            headers["X-Auth-Token"] = token # Update headers
-            response = requests.get(url, headers=headers, params=params, verify=False) # Retry
+            return _reformat(await _cached_conditional_response(f"raw {_response_cache_key(_DEVICES_PATH, params)}", _DEVICES_CACHE_TTL_SECONDS, fetch_raw), pretty)
 
-            if response.status_code == 200:
-                devices = response.json().get("response", [])
-                return json.dumps(devices, indent=2)
-            else:
-                raise Exception(f"Failed to fetch devices after token refresh. Status: {response.status_code}, Body: {response.text}")
-        else:
-            raise Exception(f"Failed to fetch devices. Status: {response.status_code}, Body: {response.text}")
+        return _reformat(await _fetch_devices(params), pretty)
     except Exception as e:
         # print(f"DEBUG: Error in fetch_devices: {str(e)}") # Optional
         raise Exception(f"Error fetching devices: {str(e)}")
 
+# Reduces a site to its identity and Location details, dropping the rest of additionalInfo
+def _compact_site(site: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the compact representation of a site returned by fetch_sites."""
+    additional_info = site.get("additionalInfo")
+    # Attributes of the first Location entry, found in a single short-circuiting pass
+    location: Dict[str, Any] = next(
+        (
+            info["attributes"]
+            for info in (additional_info if isinstance(additional_info, list) else ())
+            if isinstance(info, dict) and info.get("nameSpace") == "Location" and isinstance(info.get("attributes"), dict)
+        ),
+        {},
+    )
+    get = site.get
+    get_location = location.get
+    return {
+        "id": get("id"),
+        "name": get("name"),
+        "parentId": get("parentId"),
+        "siteNameHierarchy": get("siteNameHierarchy"),
+        "type": get_location("type"),
+        "address": get_location("address"),
+        "latitude": get_location("latitude"),
+        "longitude": get_location("longitude"),
+    }
+
 # Fetch sites from CCC
 @mcp.tool()
-async def fetch_sites() -> str:
-    """Fetches a list of sites from Cisco Catalyst Center"""
+@_instrumented
+async def fetch_sites(pretty: bool = False) -> str:
+    """Fetches a list of sites from Cisco Catalyst Center. Results are cached for 5 minutes.
+
+    Args:
+        pretty (bool): Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
+    """
     try:
-        token = await get_or_refresh_token()
-        url = f"{CCC_HOST}/dna/intent/api/v1/site"
-        headers = {"X-Auth-Token": token, "Accept": "application/json"}
-        response = requests.get(url, headers=headers, verify=False)
+        async def fetch(etag: Optional[str]) -> tuple[str, Optional[str]]:
+            async with _authed_stream(_SITES_PATH, etag=etag) as response:
+                # Compact and serialize each site as it streams in; the full site objects are never held at once
+                compact_sites = (_compact_site(site) async for site in _iter_json_items(response))
+                return await _serialize_items(compact_sites), response.headers.get("ETag")
 
-        if response.status_code == 200:
-            original_sites = response.json().get("response", [])
-            compact_sites = []
-            for site in original_sites:
-                location_info = {}
-                if isinstance(site.get("additionalInfo"), list):
-                    for info in site["additionalInfo"]:
-                        if isinstance(info, dict) and info.get("nameSpace") == "Location" and isinstance(info.get("attributes"), dict):
-                            location_info["type"] = info["attributes"].get("type")
-                            location_info["address"] = info["attributes"].get("address")
-                            location_info["latitude"] = info["attributes"].get("latitude")
-                            location_info["longitude"] = info["attributes"].get("longitude")
-                            break 
-                
-                compact_site = {
-                    "id": site.get("id"),
-                    "name": site.get("name"),
-                    "parentId": site.get("parentId"),
-                    "siteNameHierarchy": site.get("siteNameHierarchy"),
-                    "type": location_info.get("type"),
-                    "address": location_info.get("address"),
-                    "latitude": location_info.get("latitude"),
-                    "longitude": location_info.get("longitude"),
-                }
-                compact_sites.append(compact_site)
-            return json.dumps(compact_sites, indent=2)
-        elif response.status_code == 401: # Token expired or invalid
-            # print("DEBUG: Token expired for fetch_sites. Refreshing.") # Optional
-            global _current_token
-            async with _token_lock:
-                _current_token = None # Invalidate token
-            
-            token = await get_or_refresh_token() # Get new token
-            headers["X-Auth-Token"] = token # Update headers
-            response = requests.get(url, headers=headers, verify=False) # Retry
-
-            if response.status_code == 200:
-                original_sites = response.json().get("response", [])
-                compact_sites = []
-                for site in original_sites:
-                    location_info = {}
-                    if isinstance(site.get("additionalInfo"), list):
-                        for info in site["additionalInfo"]:
-                            if isinstance(info, dict) and info.get("nameSpace") == "Location" and isinstance(info.get("attributes"), dict):
-                                location_info["type"] = info["attributes"].get("type")
-                                location_info["address"] = info["attributes"].get("address")
-                                location_info["latitude"] = info["attributes"].get("latitude")
-                                location_info["longitude"] = info["attributes"].get("longitude")
-                                break
-                    
-                    compact_site = {
-                        "id": site.get("id"),
-                        "name": site.get("name"),
-                        "parentId": site.get("parentId"),
-                        "siteNameHierarchy": site.get("siteNameHierarchy"),
-                        "type": location_info.get("type"),
-                        "address": location_info.get("address"),
-                        "latitude": location_info.get("latitude"),
-                        "longitude": location_info.get("longitude"),
-                    }
-                    compact_sites.append(compact_site)
-                return json.dumps(compact_sites, indent=2)
-            else:
-                raise Exception(f"Failed to fetch sites after token refresh. Status: {response.status_code}, Body: {response.text}")
-        else:
-            raise Exception(f"Failed to fetch sites. Status: {response.status_code}, Body: {response.text}")
+        return _reformat(await _cached_conditional_response(_response_cache_key(_SITES_PATH), _SITES_CACHE_TTL_SECONDS, fetch), pretty)
     except Exception as e:
         # print(f"DEBUG: Error in fetch_sites: {str(e)}") # Optional
         raise Exception(f"Error fetching sites: {str(e)}")
 
+# Internal helper to fetch the serialized interface list for one device
+async def _fetch_device_interfaces(device_id: str) -> str:
+    """Fetches the interface list for a device as a JSON array string, cached for 30 seconds."""
+    path = _INTERFACES_PATH.format(device_id=device_id)
+
+    async def fetch(etag: Optional[str]) -> tuple[str, Optional[str]]:
+        async with _authed_stream(path, etag=etag) as response:
+            return await _serialize_items(_iter_json_items(response)), response.headers.get("ETag")
+
+    return await _cached_conditional_response(_response_cache_key(path), _INTERFACES_CACHE_TTL_SECONDS, fetch)
+
 # Fetch interfaces from CCC
 @mcp.tool()
-async def fetch_interfaces(device_id: str) -> str:
-    """Fetches interface information for a specific device from Cisco Catalyst Center
+@_instrumented
+async def fetch_interfaces(device_id: str, pretty: bool = False) -> str:
+    """Fetches interface information for a specific device from Cisco Catalyst Center.
+    Results are cached for 30 seconds per device.
 
     Args:
         device_id: The ID of the device to fetch interfaces for
+        pretty: Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
     """
     try:
-        token = await get_or_refresh_token()
-        url = f"{CCC_HOST}/dna/intent/api/v1/interface/network-device/{device_id}"
-        headers = {"X-Auth-Token": token, "Accept": "application/json"}
-        response = requests.get(url, headers=headers, verify=False)
+        return _reformat(await _fetch_device_interfaces(device_id), pretty)
+    except Exception as e:
+        # print(f"DEBUG: Error in fetch_interfaces (device: {device_id}): {str(e)}") # Optional
+        raise Exception(f"Error fetching interfaces for device {device_id}: {str(e)}")
 
-        if response.status_code == 200:
-            interfaces = response.json().get("response", [])
-            return json.dumps(interfaces, indent=2)
-        elif response.status_code == 401: # Token expired or invalid
-            # print(f"DEBUG: Token expired for fetch_interfaces (device: {device_id}). Refreshing.") # Optional
-            global _current_token
-            async with _token_lock:
-                _current_token = None # Invalidate token
-            
-            token = await get_or_refresh_token() # Get new token
-            headers["X-Auth-Token"] = token # Update headers
-            response = requests.get(url, headers=headers, verify=False) # Retry
+# Fetch interfaces for several devices from CCC concurrently
+# Cap on in-flight per-device requests, kept well below the HTTP client's connection limit
+_INTERFACE_FETCH_CONCURRENCY = 16
+
+async def _gather_device_interfaces(device_ids: List[str], return_exceptions: bool = False) -> List[Any]:
+    """Fetches the serialized interface lists for several devices concurrently, in the order given.
+    With return_exceptions, a failed device yields its exception instead of failing the whole batch."""
+    semaphore = asyncio.Semaphore(_INTERFACE_FETCH_CONCURRENCY)
+
+    async def fetch_one(device_id: str) -> str:
+        async with semaphore:
+            return await _fetch_device_interfaces(device_id)
+
+    return await asyncio.gather(*(fetch_one(device_id) for device_id in device_ids), return_exceptions=return_exceptions)
+
+@mcp.tool()
+@_instrumented
+async def fetch_all_interfaces(device_ids: Json[List[str]], pretty: bool = False) -> str:
+    """Fetches interface information for several devices from Cisco Catalyst Center in one call.
+    Prefer this over calling `fetch_interfaces` once per device; the requests are issued
+    concurrently over the shared connection, at most 16 at a time.
+
+    Args:
+        device_ids (Json[List[str]]): List of device IDs to fetch interfaces for,
+            e.g., `["<device-uuid-1>", "<device-uuid-2>"]`.
+        pretty (bool): Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
+
+    Returns:
+        str: A JSON object mapping each device ID to its list of interfaces.
+    """
+    try:
+        # A device listed more than once is fetched once and appears once in the result
+        unique_ids = list(dict.fromkeys(device_ids))
+        results = await _gather_device_interfaces(unique_ids)
+        # Each result is already serialized; Fragment embeds it without parsing it again
+        return _reformat(_dumps({device_id: orjson.Fragment(interfaces) for device_id, interfaces in zip(unique_ids, results)}), pretty)
+    except Exception as e:
+        raise Exception(f"Error fetching interfaces for devices {device_ids}: {str(e)}")
+
+# Fetch devices together with their interfaces from CCC
+@mcp.tool()
+@_instrumented
+async def fetch_devices_with_interfaces(filters: Optional[Json[Dict[str, Any]]] = None, pretty: bool = False) -> str:
+    """Fetches devices matching the filters along with each device's interfaces, in one call.
+    Use this instead of `fetch_devices` followed by `fetch_interfaces` for every device; the
+    interface requests are issued concurrently, at most 16 at a time. Never use this tool without a filter.
 
-            if response.status_code == 200:
-                interfaces = response.json().get("response", [])
-                return json.dumps(interfaces, indent=2)
+    Args:
+        filters (Optional[Json[Dict[str, Any]]]): Device filter parameters, exactly as accepted by
+            `fetch_devices` (including `attributes`), e.g., `{"role": ["ACCESS"], "attributes": ["id", "hostname"]}`.
+        pretty (bool): Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
+
+    Returns:
+        str: A JSON list of devices, each with an added `interfaces` list. If a device's interfaces
+            could not be fetched, its `interfaces` is null and `interfacesError` describes the failure.
+    """
+    try:
+        devices = orjson.loads(await _fetch_devices(_device_query_params(filters, required_fields=("id",))))
+        results = await _gather_device_interfaces([device["id"] for device in devices], return_exceptions=True)
+        for device, interfaces in zip(devices, results):
+            if isinstance(interfaces, BaseException):
+                device["interfaces"] = None
+                device["interfacesError"] = str(interfaces)
             else:
-                raise Exception(f"Failed to fetch interfaces for device {device_id} after token refresh. Status: {response.status_code}, Body: {response.text}")
-        else:
-            raise Exception(f"Failed to fetch interfaces for device {device_id}. Status: {response.status_code}, Body: {response.text}")
+                # Already serialized; Fragment embeds it without parsing it again
+                device["interfaces"] = orjson.Fragment(interfaces)
+        return _reformat(_dumps(devices), pretty)
     except Exception as e:
-        # print(f"DEBUG: Error in fetch_interfaces (device: {device_id}): {str(e)}") # Optional
-        raise Exception(f"Error fetching interfaces for device {device_id}: {str(e)}")
+        raise Exception(f"Error fetching devices with interfaces: {str(e)}")
 
 # ---- Helper Time Conversion Tool ----
+# The clients APIs reject a startTime more than 30 days before the current time
+_THIRTY_DAYS = timedelta(days=30)
+# Grammar accepted for time_window: "last X minutes/hours/days", "today" or "yesterday"
+_TIME_WINDOW_RE = re.compile(r"^(?:last\s+(?P<count>\d+)\s+(?P<unit>minute|hour|day)s?|(?P<keyword>today|yesterday))$")
+_TIME_WINDOW_UNITS = {"minute": "minutes", "hour": "hours", "day": "days"}
+
 @mcp.tool()
+@_instrumented
 async def get_api_compatible_time_range(
     time_window: Optional[str] = None,
     start_datetime_iso: Optional[str] = None,
-    end_datetime_iso: Optional[str] = None
+    end_datetime_iso: Optional[str] = None,
+    pretty: bool = False
 ) -> str:
     """
     Converts various time inputs into a valid startTime and endTime epoch millisecond pair,
@@ -317,6 +948,8 @@ async def get_api_compatible_time_range(
             Used if time_window is not provided.
         end_datetime_iso (Optional[str]): A specific end date/time in ISO 8601 format.
             Used if time_window is not provided. Defaults to current time if only start_datetime_iso is given.
+        pretty (bool): Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
 
     Returns:
         str: A JSON string containing:
@@ -333,36 +966,22 @@ async def get_api_compatible_time_range(
 
     if time_window:
         original_request_info = f"time_window='{time_window}'"
-        time_window_lower = time_window.lower()
-        num_str, unit = "", ""
-        parts = time_window_lower.split() # e.g. ["last", "2", "hours"]
+        match = _TIME_WINDOW_RE.match(time_window.strip().lower())
 
-        if "last" in parts and len(parts) == 3:
-            try:
-                num_val = int(parts[1])
-                unit = parts[2]
-                if unit.startswith("minute"): delta = timedelta(minutes=num_val)
-                elif unit.startswith("hour"): delta = timedelta(hours=num_val)
-                elif unit.startswith("day"): delta = timedelta(days=num_val)
-                else: raise ValueError(f"Unsupported time unit in time_window: {unit}")
-                
-                end_dt_utc = now_utc
-                start_dt_utc = end_dt_utc - delta
-            except ValueError:
+        if match is None:
+            if time_window.lower().split()[:1] == ["last"]:
                 raise ValueError(f"Invalid format for 'last X unit' in time_window: '{time_window}'. Expected e.g., 'last 2 hours'.")
-
-        elif time_window_lower == "today":
+            raise ValueError(f"Unsupported time_window format: '{time_window}'. Supported: 'last X minutes/hours/days', 'today', 'yesterday', 'last 30 days'.")
+        elif match["count"] is not None: # "last X minutes/hours/days", including "last 30 days"
+            end_dt_utc = now_utc
+            start_dt_utc = end_dt_utc - timedelta(**{_TIME_WINDOW_UNITS[match["unit"]]: int(match["count"])})
+        elif match["keyword"] == "today":
             end_dt_utc = now_utc
             start_dt_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
-        elif time_window_lower == "yesterday":
+        else: # "yesterday"
             yesterday_dt = now_utc - timedelta(days=1)
             start_dt_utc = yesterday_dt.replace(hour=0, minute=0, second=0, microsecond=0)
             end_dt_utc = yesterday_dt.replace(hour=23, minute=59, second=59, microsecond=999999)
-        elif time_window_lower == "last 30 days": # Explicitly handle this common case
-            end_dt_utc = now_utc
-            start_dt_utc = end_dt_utc - timedelta(days=30)
-        else:
-            raise ValueError(f"Unsupported time_window format: '{time_window}'. Supported: 'last X minutes/hours/days', 'today', 'yesterday', 'last 30 days'.")
 
     elif start_datetime_iso:
         original_request_info = f"start_datetime_iso='{start_datetime_iso}'"
@@ -393,7 +1012,7 @@ async def get_api_compatible_time_range(
         raise ValueError("Could not determine start or end time from inputs.")
 
     # Enforce Catalyst Center API's 30-day limit for startTime
-    thirty_days_ago_from_now = now_utc - timedelta(days=30)
+    thirty_days_ago_from_now = now_utc - _THIRTY_DAYS
     # Ensure we compare against the actual 'now' for the 30-day window, not a potentially user-supplied 'end_dt_utc'
     # that might be in the past.
     
@@ -406,22 +1025,182 @@ async def get_api_compatible_time_range(
     start_epoch_ms = int(start_dt_utc.timestamp() * 1000)
     end_epoch_ms = int(end_dt_utc.timestamp() * 1000)
 
-    return json.dumps({
+    return _dumps({
         "startTime": start_epoch_ms,
         "endTime": end_epoch_ms,
         "adjusted_for_30_day_limit": adjusted,
         "original_request_info": original_request_info,
         "start_datetime_utc_iso": start_dt_utc.isoformat(), # For clarity/debugging
         "end_datetime_utc_iso": end_dt_utc.isoformat()      # For clarity/debugging
-    }, indent=2)
+    }, pretty)
 
 # ---- Client API Functions ----
 
+# Tool argument name -> API query parameter name for the filters shared by the clients endpoints
+_CLIENT_FILTER_PARAMS = {
+    "start_time": "startTime",
+    "end_time": "endTime",
+    "client_type": "type",
+    "os_type": "osType",
+    "os_version": "osVersion",
+    "site_hierarchy": "siteHierarchy",
+    "site_hierarchy_id": "siteHierarchyId",
+    "site_id": "siteId",
+    "ipv4_address": "ipv4Address",
+    "ipv6_address": "ipv6Address",
+    "mac_address": "macAddress",
+    "wlc_name": "wlcName",
+    "connected_network_device_name": "connectedNetworkDeviceName",
+    "ssid": "ssid",
+    "band": "band",
+}
+# Additional arguments accepted only by get_clients_list
+_CLIENT_LIST_PARAMS = {
+    "offset": "offset",
+    "sort_by": "sortBy",
+    "order": "order",
+    "view": "view",
+    "attribute": "attribute",
+}
+_CLIENT_TYPES = {"wired": "Wired", "wireless": "Wireless"}
+# Suggested endTime in a 14006 "data not ready" error, e.g. "... Please query with endTime=1747407420000 instead."
+_ENDTIME_RE = re.compile(r"query with endTime=(\d+)")
+# Client MAC addresses as aa:bb:cc:dd:ee:ff, aa-bb-cc-dd-ee-ff, aabb.ccdd.eeff or aabbccddeeff
+_MAC_RE = re.compile(
+    r"^(?:[0-9A-Fa-f]{2}([:-])(?:[0-9A-Fa-f]{2}\1){4}[0-9A-Fa-f]{2}"
+    r"|[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4}"
+    r"|[0-9A-Fa-f]{12})$"
+)
+# A startTime this far past the 30-day limit is rejected locally; closer calls are left for the API,
+# since a range clamped by get_api_compatible_time_range ages past the limit before it is used.
+_START_TIME_SLACK = timedelta(hours=1)
+# The clients API returns at most 100 clients per request. With auto_paginate, get_clients_list
+# fetches up to _CLIENTS_MAX_PAGES pages, at most _CLIENT_PAGE_FETCH_CONCURRENCY at a time.
+_CLIENTS_PAGE_SIZE = 100
+_CLIENTS_MAX_PAGES = 20
+_CLIENT_PAGE_FETCH_CONCURRENCY = 5
+
+def _client_query_params(args: Dict[str, Any], param_map: Dict[str, str]) -> Dict[str, Any]:
+    """Builds API query parameters from a tool's arguments, skipping any left as None."""
+    params = {api_name: args[arg_name] for arg_name, api_name in param_map.items() if args[arg_name] is not None}
+    if "type" in params:
+        # The API expects "Wired" or "Wireless"; anything else is passed as is for the API to validate
+        params["type"] = _CLIENT_TYPES.get(params["type"].lower(), params["type"])
+    return params
+
+def _caller_headers(x_caller_id: Optional[str]) -> Dict[str, str]:
+    """Returns the X-CALLER-ID header for a client tool call, or no headers if x_caller_id is None."""
+    return {"X-CALLER-ID": x_caller_id} if x_caller_id is not None else {}
+
+# Internal helper to reject a startTime the clients API is certain to refuse
+def _check_client_start_time(start_time: Optional[int], operation: str) -> None:
+    """Raises ValueError, without making a request, if start_time is well over 30 days ago (API error 14013)."""
+    if start_time is not None and start_time < (time.time() - (_THIRTY_DAYS + _START_TIME_SLACK).total_seconds()) * 1000:
+        raise ValueError(f"Invalid start_time in {operation}: Start time cannot be more than 30 days before current time (API error 14013). "
+                         "Use get_api_compatible_time_range to generate compliant timestamps.")
+
+# Internal helper shared by the client tools for the clients API's 400 error codes
+async def _clients_api_get(url: str, params: Dict[str, Any], headers: Dict[str, Any], operation: str, what: str) -> httpx.Response:
+    """GETs a clients API endpoint and returns the response for anything other than a 400.
+
+    A 14013 error (startTime more than 30 days ago) raises ValueError. A 14006 error (data not
+    ready for endTime) is retried once with the endTime the API suggests. Any other 400 raises.
+    `operation` names the calling tool in API errors and `what` completes "Failed to get ...".
+    """
+    response = await _authed_request("GET", url, params=params, extra_headers=headers)
+    if response.status_code != 400:
+        return response
+    try:
+        errors = orjson.loads(response.content).get("response")
+        api_error = errors[0] if isinstance(errors, list) and errors else {}
+    except (orjson.JSONDecodeError, AttributeError, KeyError):
+        api_error = {}
+    error_code = api_error.get("errorCode") if isinstance(api_error, dict) else None
+    if error_code == 14013: # Specific error code for time range
+        raise ValueError(f"API Error (14013) in {operation}: {api_error.get('message', 'Start time cannot be more than 30 days before current time.')}")
+    if error_code == 14006: # Data not ready for endTime
+        message = api_error.get("message", "")
+        # Example: "Data is not complete/ready for endTime=1747407537569. Please query with endTime=1747407420000 instead."
+        match = _ENDTIME_RE.search(message)
+        if not match:
+            raise Exception(f"API Error (14006) in {operation}: {message}. Could not parse suggested endTime for retry.")
+        # print(f"DEBUG: API suggested new endTime: {match.group(1)}. Retrying {operation}.")
+        # Retry ONCE with the suggested endTime; _authed_request handles a 401 on the retry as well.
+        retry_response = await _authed_request("GET", url, params={**params, "endTime": int(match.group(1))}, extra_headers=headers)
+        if retry_response.status_code == 400:
+            raise Exception(f"Failed to get {what} on retry with suggested endTime. Status: 400, Body: {retry_response.text}")
+        return retry_response
+    raise Exception(f"Failed to get {what}. Status: 400, Body: {response.text}")
+
+# Internal helper to fetch several pages of the clients list concurrently
+async def _fetch_client_pages(url: str, params: Dict[str, Any], headers: Dict[str, Any], total: int) -> str:
+    """Fetches `total` clients starting at params["offset"], one page of up to 100 per request,
+    and returns them merged into a single clients list response with a matching `page` block."""
+    start = params.get("offset") or 1
+    semaphore = asyncio.Semaphore(_CLIENT_PAGE_FETCH_CONCURRENCY)
+
+    async def fetch_page(page_offset: int) -> Dict[str, Any]:
+        page_params = {**params, "offset": start + page_offset, "limit": min(_CLIENTS_PAGE_SIZE, total - page_offset)}
+        async with semaphore:
+            response = await _clients_api_get(url, page_params, headers, "get_clients_list", "clients list")
+        if response.status_code != 200:
+            raise Exception(f"Failed to get clients list page at offset {page_params['offset']}. Status: {response.status_code}, Body: {response.text}")
+        return orjson.loads(response.content)
+
+    pages = await asyncio.gather(*(fetch_page(page_offset) for page_offset in range(0, total, _CLIENTS_PAGE_SIZE)))
+    clients = [client for page in pages for client in page.get("response") or []]
+    return _dumps({
+        "response": clients,
+        # Same shape as a single-page reply: the first page's block (e.g. sortBy), describing the merged result
+        "page": {**(pages[0].get("page") or {}), "offset": start, "limit": total, "count": len(clients)},
+        "version": pages[0].get("version"),
+    })
+
+# Internal helper to fetch the serialized client count response for a set of filters
+async def _fetch_clients_count(params: Dict[str, Any], x_caller_id: Optional[str]) -> str:
+    """Fetches the clients count response for params as a JSON string, cached for 30 seconds.
+    If the API reports data is not ready for the requested endTime, retries once with the endTime it suggests."""
+    url = _CLIENTS_COUNT_PATH
+    headers = _caller_headers(x_caller_id) # Accept and X-Auth-Token are added for us
+
+    async def fetch() -> str:
+        response = await _clients_api_get(url, params, headers, "get_clients_count", "clients count")
+        if response.status_code == 200:
+            return response.text
+        raise Exception(f"Failed to get clients count. Status: {response.status_code}, Body: {response.text}")
+
+    return await _cached_response(_response_cache_key(url, params), _COUNTS_CACHE_TTL_SECONDS, fetch)
+
+async def _get_clients_count_impl(params: Dict[str, Any], x_caller_id: Optional[str]) -> tuple[int, Any]:
+    """Returns the number of clients matching params, with the API version reported alongside it."""
+    count_data = orjson.loads(await _fetch_clients_count(params, x_caller_id))
+    response_field_from_count = count_data.get("response")
+
+    extracted_count_value = None
+    if isinstance(response_field_from_count, int):
+        # Case 1: The 'response' field is directly the integer count (as per some API docs)
+        extracted_count_value = response_field_from_count
+    elif isinstance(response_field_from_count, dict):
+        # Case 2: The 'response' field is a dictionary, hopefully containing a 'count' key
+        # (as observed in the traceback: {'response': {'count': 7506}, ...})
+        extracted_count_value = response_field_from_count.get("count")
+
+    if not isinstance(extracted_count_value, int):
+        # If after the above checks, we still don't have an integer, the structure is unexpected.
+        error_detail = (
+            f"Expected an integer count, but failed to extract it. "
+            f"'response' field from count API was: {response_field_from_count} (type: {type(response_field_from_count)}). "
+            f"Attempted extraction resulted in: {extracted_count_value} (type: {type(extracted_count_value)})."
+        )
+        raise Exception(f"Invalid or unexpected data structure for client count. {error_detail}. Full count_data: {count_data}")
+    return extracted_count_value, count_data.get("version", "1.0")
+
 @mcp.tool()
+@_instrumented
 async def get_clients_list(
     start_time: Optional[int] = None,
     end_time: Optional[int] = None,
-    limit: Optional[int] = 100, # Default and max cap is 100
+    limit: Optional[int] = None, # Defaults to 100, which is also the cap
     offset: Optional[int] = 1,
     sort_by: Optional[str] = None,
     order: Optional[str] = "asc",
@@ -440,25 +1219,32 @@ async def get_clients_list(
     band: Optional[Json[List[str]]] = None,
     view: Optional[Json[List[str]]] = None,
     attribute: Optional[Json[List[str]]] = None,
-    x_caller_id: Optional[str] = "Roo-MCP-get_clients_list"
+    auto_paginate: bool = False,
+    x_caller_id: Optional[str] = "Roo-MCP-get_clients_list",
+    pretty: bool = False
 ) -> str:
     """
     Retrieves a list of clients from Cisco Catalyst Center, with comprehensive filtering options.
-    This function will not return more than 100 clients. If the query matches more than 100 clients,
-    it will return a message suggesting more specific filters, along with the total count of matching clients.
+    This function will not return more than 100 clients unless `auto_paginate` is set, in which case it
+    returns up to 2000. When `limit` is omitted, the matching clients are counted first: if the query
+    matches more clients than that, it will return a message suggesting more specific filters, along
+    with the total count of matching clients. An explicit `limit` skips the count and simply returns
+    the first `limit` matching clients (capped at 100, or 2000 with `auto_paginate`).
     If `startTime` is not provided, the API defaults to the current time. If `endTime` is not provided,
     it typically implies up to the current time or is unbounded, depending on API behavior.
     Note: If the API indicates data is not ready for the requested endTime, this tool
-    will attempt to leverage the `get_clients_count` call's retry logic which handles this.
+    will automatically retry once with the API-suggested endTime.
 
     Filter Parameters:
     - start_time (Optional[int]): UNIX epoch milliseconds. Filters clients active at or after this time.
                                   Note: The API restricts this to be no more than 30 days before the current time.
                                   Consider using `get_api_compatible_time_range` to generate compliant timestamps.
     - end_time (Optional[int]): UNIX epoch milliseconds. Filters clients active at or before this time.
-    - limit (Optional[int]): Maximum number of clients to return. Defaults to 100. If a value greater than 100
-                             is provided, it will be capped at 100. The actual number of returned clients
+    - limit (Optional[int]): Maximum number of clients to return. Defaults to 100, or every match up to 2000
+                             with auto_paginate. If a value greater than 100
+                             is provided, it will be capped at 100 (2000 with auto_paginate). The actual number of returned clients
                              may also be limited by the total number of matching clients if less than this value.
+                             Passing a limit skips the up-front count, so the "too many clients" message is not returned.
     - offset (Optional[int]): Starting record index for pagination. Defaults to 1.
     - sort_by (Optional[str]): Attribute to sort clients by (e.g., "clientConnectionTime", "clientHealthScore").
                                Refer to Cisco DNA Center API documentation for available sortable attributes.
@@ -480,150 +1266,63 @@ async def get_clients_list(
                                   Refer to API documentation for available views.
     - attribute (Optional[List[str]]): List of specific client attributes to retrieve.
                                        Refer to API documentation for available attributes.
+    - auto_paginate (bool): Allow up to 2000 clients by fetching 100-client pages concurrently and merging
+                            them into one response. Defaults to False.
     - x_caller_id (Optional[str]): Custom X-CALLER-ID header value for API requests.
                                    Defaults to "Roo-MCP-get_clients_list".
+    - pretty (bool): Indent the returned JSON for readability. Defaults to False; compact output
+                     is smaller and faster to produce, so only set this when a human will read it.
 
     Returns:
-        str: A JSON string containing the list of clients if count <= 100,
-             or a message suggesting more specific filters if count > 100.
+        str: A JSON string containing the list of clients if count <= 100 (2000 with auto_paginate),
+             or a message suggesting more specific filters otherwise.
              Includes error details if the operation fails.
     API Spec: GET /dna/data/api/v1/clients
     """
+    args = locals()
     try:
-        # First, get the total count of clients matching the filters
-        count_response_str = await get_clients_count(
-            start_time=start_time,
-            end_time=end_time,
-            client_type=client_type,
-            os_type=os_type,
-            os_version=os_version,
-            site_hierarchy=site_hierarchy,
-            site_hierarchy_id=site_hierarchy_id,
-            site_id=site_id,
-            ipv4_address=ipv4_address,
-            ipv6_address=ipv6_address,
-            mac_address=mac_address,
-            wlc_name=wlc_name,
-            connected_network_device_name=connected_network_device_name,
-            ssid=ssid,
-            band=band,
-            x_caller_id="Roo-MCP-get_clients_list_internal_count" # Internal call ID
-        )
-        count_data = json.loads(count_response_str)
-        response_field_from_count = count_data.get("response")
-
-        extracted_count_value = None
-        if isinstance(response_field_from_count, int):
-            # Case 1: The 'response' field is directly the integer count (as per some API docs)
-            extracted_count_value = response_field_from_count
-        elif isinstance(response_field_from_count, dict):
-            # Case 2: The 'response' field is a dictionary, hopefully containing a 'count' key
-            # (as observed in the traceback: {'response': {'count': 7506}, ...})
-            extracted_count_value = response_field_from_count.get("count")
-        
-        if not isinstance(extracted_count_value, int):
-            # If after the above checks, we still don't have an integer, the structure is unexpected.
-            error_detail = (
-                f"Expected an integer count, but failed to extract it. "
-                f"'response' field from count API was: {response_field_from_count} (type: {type(response_field_from_count)}). "
-                f"Attempted extraction resulted in: {extracted_count_value} (type: {type(extracted_count_value)})."
-            )
-            raise Exception(f"Invalid or unexpected data structure for client count. {error_detail}. Full count_data: {count_data}")
-
-        total_matching_clients = extracted_count_value # This should now be the correct integer count
-
-        if total_matching_clients > 100:
-            return json.dumps({
-                "message": f"Query matches {total_matching_clients} clients, which is more than the allowed 100. Please provide more specific filters.",
-                "total_matching_clients": total_matching_clients,
-                "response": [] # Keep structure similar to API response
-            }, indent=2)
-
-        if total_matching_clients == 0:
-            return json.dumps({
-                "response": [],
-                "version": count_data.get("version", "1.0"), # Use version from count_data if available
-                "message": "No clients match the provided filters."
-            }, indent=2)
-
-        # Proceed to fetch the client list if 0 < total_matching_clients <= 100
-        token = await get_or_refresh_token()
-        url = f"{CCC_HOST}/dna/data/api/v1/clients"
-        headers = {
-            "X-Auth-Token": token, 
-            "Accept": "application/json",
-            "X-CALLER-ID": x_caller_id # Use original x_caller_id for the list request
-        }
-        
-        params: Dict[str, Any] = {}
-        if start_time is not None: params["startTime"] = start_time
-        if end_time is not None: params["endTime"] = end_time
-        
-        # Determine effective limit for the API call
-        # User's 'limit' parameter defaults to 100. Cap it at 100 if they provide more.
-        user_capped_limit = min(limit, 100) if limit is not None else 100
-        # Request at most total_matching_clients, and at least 1 (since total_matching_clients > 0 here)
-        effective_api_limit = max(1, min(user_capped_limit, total_matching_clients))
+        _check_client_start_time(start_time, "get_clients_list")
+        filter_params = _client_query_params(args, _CLIENT_FILTER_PARAMS)
+        url = _CLIENTS_PATH
+        # Accept is set on the shared client and X-Auth-Token by _authed_request
+        headers = _caller_headers(x_caller_id) # Use original x_caller_id for the list request
+        params = {**filter_params, **_client_query_params(args, _CLIENT_LIST_PARAMS)}
+
+        max_clients = _CLIENTS_PAGE_SIZE * _CLIENTS_MAX_PAGES if auto_paginate else _CLIENTS_PAGE_SIZE
+        if limit is not None:
+            # An explicit limit needs no count: the API returns short (or empty) pages if fewer clients match
+            effective_api_limit = max(1, min(limit, max_clients))
+        else:
+            # Otherwise, first get the total count of clients matching the filters
+            total_matching_clients, count_version = await _get_clients_count_impl(filter_params, "Roo-MCP-get_clients_list_internal_count") # Internal call ID
+
+            if total_matching_clients > max_clients:
+                return _dumps({
+                    "message": f"Query matches {total_matching_clients} clients, which is more than the allowed {max_clients}. Please provide more specific filters.",
+                    "total_matching_clients": total_matching_clients,
+                    "response": [] # Keep structure similar to API response
+                }, pretty)
+
+            if total_matching_clients == 0:
+                return _dumps({
+                    "response": [],
+                    "version": count_version, # Use version from the count response if available
+                    "message": "No clients match the provided filters."
+                }, pretty)
+
+            # Proceed to fetch the client list if 0 < total_matching_clients <= max_clients:
+            # every matching client left from offset onwards, and at least 1
+            remaining_clients = total_matching_clients - (offset or 1) + 1
+            effective_api_limit = max(1, min(max_clients, remaining_clients))
+
+        if effective_api_limit > _CLIENTS_PAGE_SIZE:
+            return _reformat(await _fetch_client_pages(url, params, headers, effective_api_limit), pretty)
         params["limit"] = effective_api_limit
-        
-        if offset is not None: params["offset"] = offset
-        if sort_by is not None: params["sortBy"] = sort_by
-        if order is not None: params["order"] = order
-        
-        processed_client_type = client_type
-        if client_type is not None:
-            if client_type.lower() == "wired":
-                processed_client_type = "Wired"
-            elif client_type.lower() == "wireless":
-                processed_client_type = "Wireless"
-            # If it's something else, pass it as is, API will validate
-        if processed_client_type is not None: params["type"] = processed_client_type
-        
-        if os_type is not None: params["osType"] = os_type
-        if os_version is not None: params["osVersion"] = os_version
-        if site_hierarchy is not None: params["siteHierarchy"] = site_hierarchy
-        if site_hierarchy_id is not None: params["siteHierarchyId"] = site_hierarchy_id
-        if site_id is not None: params["siteId"] = site_id
-        if ipv4_address is not None: params["ipv4Address"] = ipv4_address
-        if ipv6_address is not None: params["ipv6Address"] = ipv6_address
-        if mac_address is not None: params["macAddress"] = mac_address
-        if wlc_name is not None: params["wlcName"] = wlc_name
-        if connected_network_device_name is not None: params["connectedNetworkDeviceName"] = connected_network_device_name
-        if ssid is not None: params["ssid"] = ssid
-        if band is not None: params["band"] = band
-        if view is not None: params["view"] = view
-        if attribute is not None: params["attribute"] = attribute
-
-        response = requests.get(url, headers=headers, params=params, verify=False)
+
+        response = await _clients_api_get(url, params, headers, "get_clients_list", "clients list")
 
         if response.status_code == 200:
-            return json.dumps(response.json(), indent=2)
-        elif response.status_code == 401: # Token expired
-            global _current_token
-            async with _token_lock:
-                _current_token = None # Invalidate token
-            token = await get_or_refresh_token() # Get new token
-            headers["X-Auth-Token"] = token # Update headers
-            response = requests.get(url, headers=headers, params=params, verify=False) # Retry
-            if response.status_code == 200:
-                return json.dumps(response.json(), indent=2)
-            else:
-                raise Exception(f"Failed to get clients list after token refresh. Status: {response.status_code}, Body: {response.text}")
-        elif response.status_code == 400:
-            try:
-                error_data = response.json()
-                if error_data.get("response") and isinstance(error_data["response"], list) and error_data["response"]:
-                    api_error = error_data["response"][0]
-                    if api_error.get("errorCode") == 14013:
-                        raise ValueError(f"API Error (14013) in get_clients_list: {api_error.get('message', 'Start time cannot be more than 30 days before current time.')}")
-                    # Note: errorCode 14006 (data not ready for endTime) is handled by the get_clients_count call.
-                    # If get_clients_count succeeds with a retry, get_clients_list will use the (potentially adjusted) original endTime.
-                    # If get_clients_count fails due to 14006 even after its retry, that error will propagate up.
-            except (json.JSONDecodeError, KeyError, IndexError, ValueError) as parse_or_value_error:
-                if isinstance(parse_or_value_error, ValueError) and "14013" in str(parse_or_value_error):
-                    raise parse_or_value_error
-                pass # Fall through to generic exception
-            raise Exception(f"Failed to get clients list. Status: 400, Body: {response.text}")
+            return _reformat(response.text, pretty)
         else:
             raise Exception(f"Failed to get clients list. Status: {response.status_code}, Body: {response.text}")
     except ValueError as ve: # Catch our specific ValueError (e.g. 14013) first
@@ -633,13 +1332,15 @@ async def get_clients_list(
         raise Exception(f"Error in get_clients_list: {str(e)}")
 
 @mcp.tool()
+@_instrumented
 async def get_client_details_by_mac(
     client_mac_address: str,
     start_time: Optional[int] = None,
     end_time: Optional[int] = None,
     view: Optional[Json[List[str]]] = None,
     attribute: Optional[Json[List[str]]] = None,
-    x_caller_id: Optional[str] = "Roo-MCP-get_client_details_by_mac"
+    x_caller_id: Optional[str] = "Roo-MCP-get_client_details_by_mac",
+    pretty: bool = False
 ) -> str:
     """
     Retrieves specific client information matching the MAC address.
@@ -657,17 +1358,17 @@ async def get_client_details_by_mac(
         view (Optional[List[str]]): List of views to include (e.g., ["Wireless", "WirelessHealth"]). Must be a list of strings.
         attribute (Optional[List[str]]): List of specific attributes to include. Must be a list of strings.
         x_caller_id (Optional[str]): Optional X-CALLER-ID header value.
+        pretty (bool): Indent the returned JSON for readability. Defaults to False; compact
+            output is smaller and faster to produce, so only set this when a human will read it.
     """
     try:
-        token = await get_or_refresh_token()
+        if not _MAC_RE.fullmatch(client_mac_address):
+            raise ValueError(f"Invalid client_mac_address in get_client_details_by_mac: {client_mac_address!r} is not a MAC address.")
+        _check_client_start_time(start_time, "get_client_details_by_mac")
         # The API spec indicates {id} is the MAC address.
         # Ensure MAC address is URL-encoded if it contains special characters, though typically not needed for MACs.
-        url = f"{CCC_HOST}/dna/data/api/v1/clients/{client_mac_address}"
-        headers = {
-            "X-Auth-Token": token, 
-            "Accept": "application/json",
-            "X-CALLER-ID": x_caller_id
-        }
+        url = _CLIENT_DETAILS_PATH.format(client_mac_address=client_mac_address)
+        headers = _caller_headers(x_caller_id) # Accept and X-Auth-Token are added for us
         
         params: Dict[str, Any] = {}
         if start_time is not None:
@@ -679,53 +1380,11 @@ async def get_client_details_by_mac(
         if attribute is not None:
             params["attribute"] = attribute
 
-        response = requests.get(url, headers=headers, params=params, verify=False)
+        response = await _clients_api_get(url, params, headers, "get_client_details_by_mac", f"client details for {client_mac_address}")
 
         if response.status_code == 200:
-            return json.dumps(response.json(), indent=2)
-        elif response.status_code == 401:
-            global _current_token
-            async with _token_lock:
-                _current_token = None
-            token = await get_or_refresh_token()
-            headers["X-Auth-Token"] = token
-            response = requests.get(url, headers=headers, params=params, verify=False)
-            if response.status_code == 200:
-                return json.dumps(response.json(), indent=2)
-            else:
-                raise Exception(f"Failed to get client details for {client_mac_address} after token refresh. Status: {response.status_code}, Body: {response.text}")
-        elif response.status_code == 400:
-            try:
-                error_data = response.json()
-                if error_data.get("response") and isinstance(error_data["response"], list) and error_data["response"]:
-                    api_error = error_data["response"][0]
-                    if api_error.get("errorCode") == 14013:
-                        raise ValueError(f"API Error (14013) in get_client_details_by_mac: {api_error.get('message', 'Start time cannot be more than 30 days before current time.')}")
-                    elif api_error.get("errorCode") == 14006: # Data not ready for endTime
-                        message = api_error.get("message", "")
-                        import re
-                        match = re.search(r"query with endTime=(\d+)", message)
-                        if match:
-                            suggested_end_time = int(match.group(1))
-                            params["endTime"] = suggested_end_time
-                            # print(f"DEBUG: API suggested new endTime: {suggested_end_time}. Retrying get_client_details_by_mac.")
-                            retry_response = requests.get(url, headers=headers, params=params, verify=False)
-                            if retry_response.status_code == 200:
-                                return json.dumps(retry_response.json(), indent=2)
-                            elif retry_response.status_code == 404:
-                                raise Exception(f"Client with MAC address {client_mac_address} not found on retry with suggested endTime. Status: 404, Body: {retry_response.text}")
-                            else:
-                                raise Exception(f"Failed to get client details for {client_mac_address} on retry with suggested endTime. Status: {retry_response.status_code}, Body: {retry_response.text}")
-                        else:
-                            raise Exception(f"API Error (14006) in get_client_details_by_mac: {message}. Could not parse suggested endTime for retry.")
-            except (json.JSONDecodeError, KeyError, IndexError, ValueError) as parse_or_value_error:
-                if isinstance(parse_or_value_error, ValueError) and "14013" in str(parse_or_value_error): # Re-raise specific 14013 error
-                    raise parse_or_value_error
-                # For other parsing errors or if it's not a 14013 ValueError, fall through to the generic 400 below
-                pass 
-            # Generic 400 error if not handled above
-            raise Exception(f"Failed to get client details for {client_mac_address}. Status: 400, Body: {response.text}")
-        elif response.status_code == 404: # Initial 404, not on retry
+            return _reformat(response.text, pretty)
+        elif response.status_code == 404:
              raise Exception(f"Client with MAC address {client_mac_address} not found. Status: 404, Body: {response.text}")
         else:
             raise Exception(f"Failed to get client details for {client_mac_address}. Status: {response.status_code}, Body: {response.text}")
@@ -735,6 +1394,7 @@ async def get_client_details_by_mac(
         raise Exception(f"Error in get_client_details_by_mac for {client_mac_address}: {str(e)}")
 
 @mcp.tool()
+@_instrumented
 async def get_clients_count(
     start_time: Optional[int] = None,
     end_time: Optional[int] = None,
@@ -751,7 +1411,8 @@ async def get_clients_count(
     connected_network_device_name: Optional[Json[List[str]]] = None,
     ssid: Optional[Json[List[str]]] = None,
     band: Optional[Json[List[str]]] = None,
-    x_caller_id: Optional[str] = "Roo-MCP-get_clients_count"
+    x_caller_id: Optional[str] = "Roo-MCP-get_clients_count",
+    pretty: bool = False
 ) -> str:
     """
     Retrieves the total count of clients by applying basic filtering.
@@ -779,109 +1440,14 @@ async def get_clients_count(
     - ssid (Optional[List[str]]): List of SSIDs clients are connected to. Must be a list of strings.
     - band (Optional[List[str]]): List of wireless bands (e.g., ["2.4GHz", "5GHz"]). Must be a list of strings.
     - x_caller_id (Optional[str]): Custom X-CALLER-ID header value for API requests. Defaults to "Roo-MCP-get_clients_count".
+    - pretty (bool): Indent the returned JSON for readability. Defaults to False; compact output is smaller
+                     and faster to produce, so only set this when a human will read it.
     """
+    args = locals()
     try:
-        token = await get_or_refresh_token()
-        url = f"{CCC_HOST}/dna/data/api/v1/clients/count"
-        headers = {
-            "X-Auth-Token": token, 
-            "Accept": "application/json",
-            "X-CALLER-ID": x_caller_id
-        }
-        
-        params: Dict[str, Any] = {}
-        if start_time is not None:
-            params["startTime"] = start_time
-        if end_time is not None:
-            params["endTime"] = end_time
-        
-        processed_client_type = client_type
-        if client_type is not None:
-            if client_type.lower() == "wired":
-                processed_client_type = "Wired"
-            elif client_type.lower() == "wireless":
-                processed_client_type = "Wireless"
-            # If it's something else, pass it as is, API will validate
-        if processed_client_type is not None: 
-            params["type"] = processed_client_type # API uses 'type'
-            
-        if os_type is not None:
-            params["osType"] = os_type
-        if os_version is not None:
-            params["osVersion"] = os_version
-        if site_hierarchy is not None:
-            params["siteHierarchy"] = site_hierarchy
-        if site_hierarchy_id is not None:
-            params["siteHierarchyId"] = site_hierarchy_id
-        if site_id is not None:
-            params["siteId"] = site_id
-        if ipv4_address is not None:
-            params["ipv4Address"] = ipv4_address
-        if ipv6_address is not None:
-            params["ipv6Address"] = ipv6_address
-        if mac_address is not None:
-            params["macAddress"] = mac_address
-        if wlc_name is not None:
-            params["wlcName"] = wlc_name
-        if connected_network_device_name is not None:
-            params["connectedNetworkDeviceName"] = connected_network_device_name
-        if ssid is not None:
-            params["ssid"] = ssid
-        if band is not None:
-            params["band"] = band
-
-        response = requests.get(url, headers=headers, params=params, verify=False)
-
-        if response.status_code == 200:
-            return json.dumps(response.json(), indent=2)
-        elif response.status_code == 401:
-            global _current_token
-            async with _token_lock:
-                _current_token = None
-            token = await get_or_refresh_token()
-            headers["X-Auth-Token"] = token
-            response = requests.get(url, headers=headers, params=params, verify=False)
-            if response.status_code == 200:
-                return json.dumps(response.json(), indent=2)
-            else:
-                raise Exception(f"Failed to get clients count after token refresh. Status: {response.status_code}, Body: {response.text}")
-        elif response.status_code == 400:
-            try:
-                error_data = response.json()
-                if error_data.get("response") and isinstance(error_data["response"], list) and error_data["response"]:
-                    api_error = error_data["response"][0]
-                    if api_error.get("errorCode") == 14013: # Specific error code for time range
-                        raise ValueError(f"API Error (14013) in get_clients_count: {api_error.get('message', 'Start time cannot be more than 30 days before current time.')}")
-                    elif api_error.get("errorCode") == 14006: # Data not ready for endTime
-                        message = api_error.get("message", "")
-                        # Attempt to parse suggested endTime. Example: "Data is not complete/ready for endTime=1747407537569. Please query with endTime=1747407420000 instead."
-                        import re
-                        match = re.search(r"query with endTime=(\d+)", message)
-                        if match:
-                            suggested_end_time = int(match.group(1))
-                            # print(f"DEBUG: API suggested new endTime: {suggested_end_time}. Retrying get_clients_count.")
-                            # Retry ONCE with the suggested endTime
-                            params["endTime"] = suggested_end_time
-                            # Need to re-fetch token in case it was the cause of the initial attempt's 401 that led to a retry that then got a 400
-                            # However, if we are here, it means the first call was not 401, or the retry after 401 was not 200.
-                            # For simplicity, just re-use existing token for this specific retry.
-                            # If token was an issue, it would likely fail again and not hit this 14006 logic.
-                            retry_response = requests.get(url, headers=headers, params=params, verify=False)
-                            if retry_response.status_code == 200:
-                                return json.dumps(retry_response.json(), indent=2)
-                            else:
-                                raise Exception(f"Failed to get clients count on retry with suggested endTime. Status: {retry_response.status_code}, Body: {retry_response.text}")
-                        else: # Could not parse suggested endTime
-                            raise Exception(f"API Error (14006) in get_clients_count: {message}. Could not parse suggested endTime for retry.")
-            except (json.JSONDecodeError, KeyError, IndexError, ValueError) as parse_or_value_error:
-                # If parsing the error or the ValueError from 14013 occurs
-                if isinstance(parse_or_value_error, ValueError) and "14013" in str(parse_or_value_error):
-                    raise parse_or_value_error # Re-raise the specific ValueError for 30-day limit
-                # Fallback if error parsing doesn't work as expected or other ValueErrors
-                pass # Will fall through to the generic exception below for other 400s
-            raise Exception(f"Failed to get clients count. Status: 400, Body: {response.text}")
-        else:
-            raise Exception(f"Failed to get clients count. Status: {response.status_code}, Body: {response.text}")
+        _check_client_start_time(start_time, "get_clients_count")
+        params = _client_query_params(args, _CLIENT_FILTER_PARAMS)
+        return _reformat(await _fetch_clients_count(params, x_caller_id), pretty)
     except ValueError as ve: # Catch our specific ValueError (e.g. 14013) first
         raise ve
     except Exception as e:
@@ -896,6 +1462,8 @@ if __name__ == "__main__":
     # - fetch_devices: Fetches a list of devices.
     # - fetch_sites: Fetches a list of sites.
     # - fetch_interfaces: Fetches interface information for a specific device.
+    # - fetch_all_interfaces: Fetches interface information for several devices concurrently.
+    # - fetch_devices_with_interfaces: Fetches devices together with their interfaces.
     # - get_clients_list: Retrieves the list of clients with filtering and sorting.
     # - get_client_details_by_mac: Retrieves specific client information by MAC address.
     # - get_clients_count: Retrieves the total count of clients with filtering.
@@ -949,4 +1517,5 @@ if __name__ == "__main__":
     # if __name__ == "__main__": # This check is already present, the main() call would be inside it
     #    # asyncio.run(main()) # Call the local test main function
     #    pass # The mcp.run() below is the primary purpose when __name__ == "__main__"
+
     mcp.run()